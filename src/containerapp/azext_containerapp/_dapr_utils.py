@@ -0,0 +1,326 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from azure.cli.core.azclierror import CLIError, ValidationError
+from azure.cli.core.commands.client_factory import get_subscription_id
+from azure.cli.core.util import send_raw_request
+from knack.log import get_logger
+
+from ._client_factory import handle_raw_exception
+from ._clients import ContainerAppClient, DaprComponentClient
+
+logger = get_logger(__name__)
+
+
+def _debug(msg, *args):
+    # Debug logging is off for normal az runs; skip the call (and its argument
+    # tuple) unless the level is actually enabled. The level is checked per
+    # call because verbosity is configured after this module is imported.
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(msg, *args)
+
+
+# API version for the ARM /batch endpoint, which allows multiple requests
+# to be sent in a single round trip.
+ARM_BATCH_API_VERSION = "2020-06-01"
+
+SERVICE_RELATIVE_URL_FMT = "/subscriptions/{}/resourceGroups/{}/providers/Microsoft.App/" \
+                           "containerApps/{}?api-version={}"
+COMPONENT_RELATIVE_URL_FMT = "/subscriptions/{}/resourceGroups/{}/providers/Microsoft.App/" \
+                             "managedEnvironments/{}/daprComponents/{}?api-version={}"
+
+# Error message templates, hoisted so looped callers do not rebuild the
+# format spec on every failure.
+_ERR_UNSUPPORTED_SERVICE_TYPE = "Service type {} is not supported. Supported service types are {}."
+_ERR_UNSUPPORTED_COMPONENT_TYPE = "Dapr component type {} is not supported. Supported component types are {}."
+_ERR_UNSUPPORTED_PAIR = "Dapr component type {} is not supported for service type {}."
+_ERR_NO_SERVICE_ID = "Could not get the resource id of service {}."
+
+# Session-scoped cache of ARM GET responses, keyed on the client and the
+# resource coordinates. CLI invocations are short-lived, so entries are never
+# expired; creates overwrite the entry for their own key.
+_arm_get_cache: Dict[Tuple, Any] = {}
+
+# Sentinel cached for lookups that came back 404, so repeated probes for the
+# same missing resource do not re-issue the request.
+_NOT_FOUND = object()
+
+
+def _cache_key(client, resource_group_name: str, *args) -> Tuple:
+    return (client.__name__, resource_group_name) + args
+
+
+def _is_not_found_error(e) -> bool:
+    if getattr(e, "status_code", None) == 404 or \
+            getattr(getattr(e, "response", None), "status_code", None) == 404:
+        return True
+    # send_raw_request surfaces errors as CLIError with the ARM error payload
+    # in the message; a missing resource reports a *NotFound error code.
+    return "NotFound" in str(e)
+
+
+def _try_show(client, cmd, resource_group_name: str, *args):
+    """
+    client.show, returning None when the resource does not exist instead of
+    raising. Hits and misses are both memoized in _arm_get_cache; errors other
+    than 404 are re-raised rather than being treated as missing.
+    """
+    key = _cache_key(client, resource_group_name, *args)
+    cached = _arm_get_cache.get(key)
+    if cached is not None:
+        return None if cached is _NOT_FOUND else cached
+
+    try:
+        result = client.show(cmd, resource_group_name, *args)
+    except Exception as e:
+        if not _is_not_found_error(e):
+            raise
+        _arm_get_cache[key] = _NOT_FOUND
+        return None
+
+    _arm_get_cache[key] = result
+    return result
+
+
+class DaprUtils:
+    supported_dapr_components = {
+        "state": ["redis", "postgres"],
+        "pubsub": ["redis", "kafka"],
+    }
+
+    # Derived once at import time for membership tests, so validation does not
+    # need to build the service factory table (and its import from custom).
+    supported_service_types = frozenset(
+        service for services in supported_dapr_components.values() for service in services)
+    supported_component_pairs = frozenset(
+        (component, service) for component, services in supported_dapr_components.items() for service in services)
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _get_supported_services() -> Mapping[str, Any]:
+        """
+        Get the supported dev services along with the functions to create them.
+
+        The import from custom is deferred to first use (it is only needed when
+        a service is actually created) and the result is cached for the rest of
+        the process; the read-only view keeps callers from mutating the cache.
+        """
+        from .custom import create_redis_service, create_postgres_service, create_kafka_service
+
+        return MappingProxyType({
+            "redis": create_redis_service,
+            "postgres": create_postgres_service,
+            "kafka": create_kafka_service,
+        })
+
+    # The set of valid names is fixed, so the tables are precomputed instead of
+    # re-deriving the names on every call. State components are conventionally
+    # named "statestore", other component types keep their own name.
+    _service_names = {
+        "redis": "dapr-redis",
+        "postgres": "dapr-postgres",
+        "kafka": "dapr-kafka",
+    }
+    _component_names = {
+        ("state", "redis"): "statestore-redis",
+        ("state", "postgres"): "statestore-postgres",
+        ("pubsub", "redis"): "pubsub-redis",
+        ("pubsub", "kafka"): "pubsub-kafka",
+    }
+
+    @staticmethod
+    def _get_service_name(service_type: str) -> str:
+        return DaprUtils._service_names[service_type]
+
+    @staticmethod
+    def _get_dapr_component_name(component_type: str, service_type: str) -> str:
+        return DaprUtils._component_names[(component_type, service_type)]
+
+    @staticmethod
+    def get_dapr_component_def_from_service(component_type: str, service_type: str, service_name: str,
+                                            service_id: str) -> Dict[str, Any]:
+        """Build a Dapr component definition bound to a dev service."""
+        # Built as a literal rather than by mutating a copy of the shared
+        # DaprComponent model: dict.copy is shallow, so writes to "properties"
+        # would leak into the module-level model between calls.
+        return {
+            "properties": {
+                "componentType": f"{component_type}.{service_type}",
+                "version": "v1",
+                "ignoreErrors": False,
+                "serviceComponentBind": [{
+                    "name": service_name,
+                    "serviceId": service_id,
+                }],
+            },
+        }
+
+    @staticmethod
+    def _batch_arm_request(cmd, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send multiple ARM requests in a single POST to the /batch endpoint and
+        return the individual responses, in the same order as the requests.
+        """
+        management_hostname = cmd.cli_ctx.cloud.endpoints.resource_manager
+        request_url = "{}/batch?api-version={}".format(management_hostname.strip('/'), ARM_BATCH_API_VERSION)
+
+        r = send_raw_request(cmd.cli_ctx, "POST", request_url, body=json.dumps({"requests": requests}))
+        return r.json()["responses"]
+
+    @staticmethod
+    def _batch_show_service_and_component(cmd, resource_group_name: str, environment_name: str, service_name: str,
+                                          component_name: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Look up the service and the Dapr component with a single ARM round trip,
+        returning None for the ones that do not exist. Falls back to individual
+        calls if the /batch endpoint is unavailable.
+        """
+        sub_id = get_subscription_id(cmd.cli_ctx)
+        service_url = SERVICE_RELATIVE_URL_FMT.format(
+            sub_id, resource_group_name, service_name, ContainerAppClient.api_version)
+        component_url = COMPONENT_RELATIVE_URL_FMT.format(
+            sub_id, resource_group_name, environment_name, component_name, DaprComponentClient.api_version)
+
+        try:
+            responses = DaprUtils._batch_arm_request(cmd, [
+                {"httpMethod": "GET", "relativeUrl": service_url},
+                {"httpMethod": "GET", "relativeUrl": component_url},
+            ])
+            defs = []
+            for response in responses:
+                status_code = response.get("httpStatusCode")
+                if status_code == 200:
+                    defs.append(response.get("content"))
+                elif status_code == 404:
+                    defs.append(None)
+                else:
+                    # Unexpected per-request failure, e.g. throttling; let the
+                    # per-call path surface the error.
+                    raise CLIError("Unexpected status code {} from ARM batch request.".format(status_code))
+            service_def, component_def = defs
+            _arm_get_cache[_cache_key(ContainerAppClient, resource_group_name, service_name)] = \
+                service_def if service_def is not None else _NOT_FOUND
+            _arm_get_cache[_cache_key(DaprComponentClient, resource_group_name, environment_name,
+                                      component_name)] = \
+                component_def if component_def is not None else _NOT_FOUND
+            return service_def, component_def
+        except Exception as e:  # pylint: disable=broad-except
+            _debug("ARM batch request failed, falling back to individual calls: %s", e)
+
+        # The two lookups are independent, so overlap them instead of paying
+        # for two sequential round trips.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            service_future = executor.submit(_try_show, ContainerAppClient, cmd, resource_group_name,
+                                             service_name)
+            component_future = executor.submit(_try_show, DaprComponentClient, cmd, resource_group_name,
+                                               environment_name, component_name)
+
+        return service_future.result(), component_future.result()
+
+    @staticmethod
+    def _create_service(cmd, service_type: str, service_name: str, resource_group_name: str, environment_name: str,
+                        no_wait: bool = False) -> Dict[str, Any]:
+        """Create a dev service of the given type, if it does not exist already."""
+        _debug("Creating service %s of type %s.", service_name, service_type)
+
+        if service_type not in DaprUtils.supported_service_types:
+            raise ValidationError(_ERR_UNSUPPORTED_SERVICE_TYPE.format(
+                service_type, ', '.join(sorted(DaprUtils.supported_service_types))))
+
+        service_def = _try_show(ContainerAppClient, cmd, resource_group_name, service_name)
+        if service_def is not None:
+            _debug("Service %s of type %s already exists, skipping creation.", service_name, service_type)
+            return service_def
+
+        create_service_func = DaprUtils._get_supported_services()[service_type]
+        try:
+            service_def = create_service_func(cmd, service_name, environment_name, resource_group_name,
+                                              no_wait=no_wait, disable_warnings=True)
+        except Exception as e:
+            handle_raw_exception(e)
+
+        _arm_get_cache[_cache_key(ContainerAppClient, resource_group_name, service_name)] = service_def
+        return service_def
+
+    @staticmethod
+    def _create_dapr_component_from_service(cmd, component_type: str, service_type: str, component_name: str,
+                                            service_name: str, service_id: str, resource_group_name: str,
+                                            environment_name: str) -> Dict[str, Any]:
+        """Create a Dapr component bound to the given dev service, if it does not exist already."""
+        _debug("Creating Dapr component %s of type %s.", component_name, component_type)
+
+        if component_type not in DaprUtils.supported_dapr_components:
+            raise ValidationError(_ERR_UNSUPPORTED_COMPONENT_TYPE.format(
+                component_type, ', '.join(DaprUtils.supported_dapr_components)))
+
+        if (component_type, service_type) not in DaprUtils.supported_component_pairs:
+            raise ValidationError(_ERR_UNSUPPORTED_PAIR.format(component_type, service_type))
+
+        component_def = _try_show(DaprComponentClient, cmd, resource_group_name, environment_name,
+                                  component_name)
+        if component_def is not None:
+            _debug("Dapr component %s of type %s already exists, skipping creation.",
+                   component_name, component_type)
+            return component_def
+
+        component_def = DaprUtils.get_dapr_component_def_from_service(component_type, service_type,
+                                                                      service_name, service_id)
+        try:
+            component_def = DaprComponentClient.create_or_update(cmd, resource_group_name, environment_name,
+                                                                 name=component_name,
+                                                                 dapr_component_envelope=component_def)
+        except Exception as e:
+            handle_raw_exception(e)
+
+        _arm_get_cache[_cache_key(DaprComponentClient, resource_group_name, environment_name,
+                                  component_name)] = component_def
+        return component_def
+
+    @staticmethod
+    def create_service_and_dapr_component(cmd, component_type: str, service_type: str, resource_group_name: str,
+                                          environment_name: str,
+                                          no_wait: bool = False) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Create a dev service and a Dapr component bound to it, e.g. a Redis
+        container app and a state store component backed by it.
+
+        The existence of the service and the component is probed with a single
+        batched ARM round trip; only the missing resources are created.
+        """
+        # Validate up front so the name lookups below only see known pairs.
+        if (component_type, service_type) not in DaprUtils.supported_component_pairs:
+            raise ValidationError(_ERR_UNSUPPORTED_PAIR.format(component_type, service_type))
+
+        service_name = DaprUtils._get_service_name(service_type)
+        component_name = DaprUtils._get_dapr_component_name(component_type, service_type)
+
+        service_def, component_def = DaprUtils._batch_show_service_and_component(
+            cmd, resource_group_name, environment_name, service_name, component_name)
+
+        if service_def is None:
+            service_def = DaprUtils._create_service(cmd, service_type, service_name, resource_group_name,
+                                                    environment_name, no_wait=no_wait)
+        else:
+            logger.warning("Service %s already exists, skipping creation.", service_name)
+
+        service_id = (service_def or {}).get("id")
+        if not service_id:
+            raise ValidationError(_ERR_NO_SERVICE_ID.format(service_name))
+
+        if component_def is None:
+            component_def = DaprUtils._create_dapr_component_from_service(
+                cmd, component_type, service_type, component_name, service_name, service_id,
+                resource_group_name, environment_name)
+        else:
+            logger.warning("Dapr component %s already exists, skipping creation.", component_name)
+
+        return service_def, component_def
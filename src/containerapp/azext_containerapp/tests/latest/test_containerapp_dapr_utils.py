@@ -0,0 +1,28 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+
+from azext_containerapp._dapr_utils import DaprUtils
+
+
+class DaprUtilsTest(unittest.TestCase):
+    def test_get_dapr_component_def_from_service(self):
+        component = DaprUtils.get_dapr_component_def_from_service(
+            "state", "redis", "dapr-redis", "/subscriptions/sub/resourceGroups/rg/providers/"
+            "Microsoft.App/containerApps/dapr-redis")
+
+        self.assertEqual(component["properties"]["componentType"], "state.redis")
+        self.assertEqual(component["properties"]["version"], "v1")
+        self.assertEqual(component["properties"]["ignoreErrors"], False)
+        self.assertEqual(component["properties"]["serviceComponentBind"][0]["name"], "dapr-redis")
+
+    def test_get_dapr_component_def_from_service_does_not_alias(self):
+        state = DaprUtils.get_dapr_component_def_from_service("state", "redis", "dapr-redis", "id-1")
+        pubsub = DaprUtils.get_dapr_component_def_from_service("pubsub", "kafka", "dapr-kafka", "id-2")
+
+        self.assertEqual(state["properties"]["componentType"], "state.redis")
+        self.assertEqual(pubsub["properties"]["componentType"], "pubsub.kafka")
+        self.assertIsNot(state["properties"], pubsub["properties"])
@@ -5,12 +5,11 @@
 
 # pylint: disable=unused-argument
 # pylint: disable=too-many-locals
-# pylint: disable=too-many-instance-attributes
 
+from functools import lru_cache
 from typing import Tuple
 
 from azure.cli.core.azclierror import InvalidArgumentValueError
-from copy import deepcopy
 from knack.log import get_logger
 from knack.prompting import prompt, prompt_y_n
 from semver import VersionInfo
@@ -21,40 +20,59 @@ from .DefaultExtension import DefaultExtension
 logger = get_logger(__name__)
 
 
+@lru_cache(maxsize=128)
+def _parse_version(version: str) -> VersionInfo:
+    return VersionInfo.parse(version)
+
+
 class Dapr(DefaultExtension):
-    def __init__(self):
-        self.TSG_LINK = "https://docs.microsoft.com/en-us/azure/aks/dapr"
-        self.DEFAULT_RELEASE_NAME = 'dapr'
-        self.DEFAULT_RELEASE_NAMESPACE = 'dapr-system'
-        self.DEFAULT_RELEASE_TRAIN = 'stable'
-        self.DEFAULT_CLUSTER_TYPE = 'managedclusters'
-        self.DEFAULT_HA = 'true'
-
-        # constants for configuration settings.
-        self.CLUSTER_TYPE_KEY = 'global.clusterType'
-        self.HA_KEY_ENABLED_KEY = 'global.ha.enabled'
-        self.APPLY_CRDS_HOOK_ENABLED_KEY = 'hooks.applyCrds'
-        self.SKIP_EXISTING_DAPR_CHECK_KEY = 'skipExistingDaprCheck'
-        self.EXISTING_DAPR_RELEASE_NAME_KEY = 'existingDaprReleaseName'
-        self.EXISTING_DAPR_RELEASE_NAMESPACE_KEY = 'existingDaprReleaseNamespace'
-
-        # constants for message prompts.
-        self.MSG_IS_DAPR_INSTALLED = "Is Dapr already installed in the cluster?"
-        self.MSG_ENTER_RELEASE_NAME = "Enter the Helm release name for Dapr, "\
-            f"or press Enter to use the default name [{self.DEFAULT_RELEASE_NAME}]: "
-        self.MSG_ENTER_RELEASE_NAMESPACE = "Enter the namespace where Dapr is installed, "\
-            f"or press Enter to use the default namespace [{self.DEFAULT_RELEASE_NAMESPACE}]: "
-        self.MSG_WARN_EXISTING_INSTALLATION = "The extension will use your existing Dapr installation. "\
-            f"Note, if you have updated the default values for global.ha.* or dapr_placement.* in your existing "\
-            "Dapr installation, you must provide them via --configuration-settings. Failing to do so will result in"\
-            "an error, since Helm upgrade will try to modify the StatefulSet."\
-            f"Please refer to {self.TSG_LINK} for more information."
-
-        self.RELEASE_INFO_HELP_STRING = "The Helm release name and namespace can be found by running 'helm list -A'."
-
-        # constants for error messages.
-        self.ERR_MSG_INVALID_SCOPE_TPL = "Invalid scope '{}'. This extension can be installed only at 'cluster' scope."\
-            f" Check {self.TSG_LINK} for more information."
+    # All state lives on the class, so instances carry no __dict__ at all.
+    __slots__ = ()
+
+    # These are immutable, so they live on the class rather than being rebuilt
+    # and re-assigned on every instantiation.
+    TSG_LINK = "https://docs.microsoft.com/en-us/azure/aks/dapr"
+    DEFAULT_RELEASE_NAME = 'dapr'
+    DEFAULT_RELEASE_NAMESPACE = 'dapr-system'
+    DEFAULT_RELEASE_TRAIN = 'stable'
+    DEFAULT_CLUSTER_TYPE = 'managedclusters'
+    DEFAULT_HA = 'true'
+
+    # constants for configuration settings.
+    CLUSTER_TYPE_KEY = 'global.clusterType'
+    HA_KEY_ENABLED_KEY = 'global.ha.enabled'
+    APPLY_CRDS_HOOK_ENABLED_KEY = 'hooks.applyCrds'
+    SKIP_EXISTING_DAPR_CHECK_KEY = 'skipExistingDaprCheck'
+    EXISTING_DAPR_RELEASE_NAME_KEY = 'existingDaprReleaseName'
+    EXISTING_DAPR_RELEASE_NAMESPACE_KEY = 'existingDaprReleaseNamespace'
+
+    # constants for message prompts. The f-strings are evaluated once at class
+    # creation, against the constants defined above in the class body.
+    MSG_IS_DAPR_INSTALLED = "Is Dapr already installed in the cluster?"
+    MSG_ENTER_RELEASE_NAME = "Enter the Helm release name for Dapr, "\
+        f"or press Enter to use the default name [{DEFAULT_RELEASE_NAME}]: "
+    MSG_ENTER_RELEASE_NAMESPACE = "Enter the namespace where Dapr is installed, "\
+        f"or press Enter to use the default namespace [{DEFAULT_RELEASE_NAMESPACE}]: "
+    MSG_WARN_EXISTING_INSTALLATION = "The extension will use your existing Dapr installation. "\
+        "Note, if you have updated the default values for global.ha.* or dapr_placement.* in your existing "\
+        "Dapr installation, you must provide them via --configuration-settings. Failing to do so will result "\
+        "in an error, since Helm upgrade will try to modify the StatefulSet. "\
+        f"Please refer to {TSG_LINK} for more information."
+
+    RELEASE_INFO_HELP_STRING = "The Helm release name and namespace can be found by running 'helm list -A'."
+
+    # The class is stateless, so a single shared instance can serve every
+    # command in the process; repeated Dapr() calls return the same object.
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    # constants for error messages.
+    ERR_MSG_INVALID_SCOPE_TPL = "Invalid scope '{}'. This extension can be installed only at 'cluster' scope."\
+        f" Check {TSG_LINK} for more information."
 
     def _get_release_info(self, release_name: str, release_namespace: str, configuration_settings: dict)\
             -> Tuple[str, str, bool]:
@@ -70,23 +88,26 @@ class Dapr(DefaultExtension):
         name = name or self.DEFAULT_RELEASE_NAME
         namespace = namespace or self.DEFAULT_RELEASE_NAMESPACE
 
-        if configuration_settings.get(self.SKIP_EXISTING_DAPR_CHECK_KEY, 'false') == 'true':
-            logger.info("%s is set to true, skipping existing Dapr check.", self.SKIP_EXISTING_DAPR_CHECK_KEY)
-            return name, namespace, False
+        # The common case passes no configuration settings at all; skip the
+        # lookups (and tolerate None) and go straight to the prompt path.
+        if configuration_settings:
+            if configuration_settings.get(self.SKIP_EXISTING_DAPR_CHECK_KEY, 'false') == 'true':
+                logger.info("%s is set to true, skipping existing Dapr check.", self.SKIP_EXISTING_DAPR_CHECK_KEY)
+                return name, namespace, False
 
-        cfg_name = configuration_settings.get(self.EXISTING_DAPR_RELEASE_NAME_KEY, None)
-        cfg_namespace = configuration_settings.get(self.EXISTING_DAPR_RELEASE_NAMESPACE_KEY, None)
+            cfg_name = configuration_settings.get(self.EXISTING_DAPR_RELEASE_NAME_KEY)
+            cfg_namespace = configuration_settings.get(self.EXISTING_DAPR_RELEASE_NAMESPACE_KEY)
 
-        # If the user has specified the release name and namespace in configuration settings, then use it.
-        if cfg_name and cfg_namespace:
-            logger.info("Using the release name and namespace specified in the configuration settings.")
-            return cfg_name, cfg_namespace, True
+            # If the user has specified the release name and namespace in configuration settings, then use it.
+            if cfg_name and cfg_namespace:
+                logger.info("Using the release name and namespace specified in the configuration settings.")
+                return cfg_name, cfg_namespace, True
 
-        # If either release name or namespace is missing, ignore the configuration settings and prompt the user.
-        if cfg_name or cfg_namespace:
-            logger.warning("Both '%s' and '%s' must be specified via --configuration-settings. Only one of them is "
-                           "specified, ignoring.", self.EXISTING_DAPR_RELEASE_NAME_KEY,
-                           self.EXISTING_DAPR_RELEASE_NAMESPACE_KEY)
+            # If either release name or namespace is missing, ignore the configuration settings and prompt the user.
+            if cfg_name or cfg_namespace:
+                logger.warning("Both '%s' and '%s' must be specified via --configuration-settings. Only one of them "
+                               "is specified, ignoring.", self.EXISTING_DAPR_RELEASE_NAME_KEY,
+                               self.EXISTING_DAPR_RELEASE_NAMESPACE_KEY)
 
         # Check explictly if Dapr is already installed in the cluster.
         # If so, reuse the release name and namespace to avoid conflicts.
@@ -131,7 +152,7 @@ class Dapr(DefaultExtension):
         scope_cluster = ScopeCluster(release_namespace=release_namespace or self.DEFAULT_RELEASE_NAMESPACE)
         extension_scope = Scope(cluster=scope_cluster, namespace=None)
 
-        if cluster_type.lower() == '' or cluster_type.lower() == self.DEFAULT_CLUSTER_TYPE:
+        if not cluster_type or cluster_type.lower() == self.DEFAULT_CLUSTER_TYPE:
             configuration_settings[self.CLUSTER_TYPE_KEY] = self.DEFAULT_CLUSTER_TYPE
 
         create_identity = False
@@ -155,7 +176,10 @@ class Dapr(DefaultExtension):
         """ExtensionType 'Microsoft.Dapr' specific validations & defaults for Update.
            Must create and return a valid 'PatchExtension' object.
         """
-        input_configuration_settings = deepcopy(configuration_settings)
+        # Settings are a flat str -> str dict, so a shallow copy is enough to
+        # preserve the caller's original for the no-changes return path.
+        input_configuration_settings = dict(configuration_settings) if configuration_settings \
+            else configuration_settings
 
         # configuration_settings can be None, so we need to set it to an empty dict.
         if configuration_settings is None:
@@ -204,7 +228,7 @@ class Dapr(DefaultExtension):
         Returns True if version v1 is less than version v2.
         """
         try:
-            return VersionInfo.parse(v1) < VersionInfo.parse(v2)
+            return _parse_version(v1) < _parse_version(v2)
         except ValueError:
             logger.debug("Warning: Unable to compare versions %s and %s.", v1, v2)
             return True  # This will cause the apply-CRDs hook to be disabled, which is safe.
@@ -19,6 +19,8 @@ from .PartnerExtensionModel import PartnerExtensionModel
 
 
 class DefaultExtension(PartnerExtensionModel):
+    __slots__ = ()
+
     def Create(
         self,
         cmd,
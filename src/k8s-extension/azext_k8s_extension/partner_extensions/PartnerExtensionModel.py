@@ -9,6 +9,10 @@ from ..vendored_sdks.models import PatchExtension
 
 
 class PartnerExtensionModel(ABC):
+    # Stateless by design; subclasses that need instance attributes get their
+    # own __dict__ automatically by not declaring __slots__ themselves.
+    __slots__ = ()
+
     @abstractmethod
     def Create(
         self,